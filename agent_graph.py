@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, TypedDict
 from langchain_core.messages import (
     BaseMessage,
@@ -7,7 +8,10 @@ from langchain_core.messages import (
 )
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain.chat_models import init_chat_model
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import StateGraph, END
 from agent_tools import SUPPORT_AGENT_TOOLS
@@ -27,63 +31,104 @@ class AgentState(TypedDict):
     agent_outcome: List[tuple]
 
 
-# Initialize LLM
-llm = init_chat_model(
-    model="llama-3.3-70b-versatile", temperature=0, model_provider="groq"
-)
+# Tag carried by the LLM that writes the user-facing answer so streaming can
+# skip router drafts and LLM calls nested inside tools (e.g. the RAG answer).
+AGENT_LLM_TAG = "support_agent"
 
+# Initialize LLMs: a small fast model decides which tools to call, and the
+# large model is reserved for writing the final answer.
+router_llm = init_chat_model(
+    model="llama-3.1-8b-instant", temperature=0, model_provider="groq"
+)
+synth_llm = init_chat_model(
+    model="llama-3.3-70b-versatile",
+    temperature=0,
+    model_provider="groq",
+    tags=[AGENT_LLM_TAG],
+)
 
-# Agent system prompt
-SYSTEM_PROMPT = """You are an autonomous customer support agent. Analyze each query and choose the appropriate tools.
+# Cache LLM responses so identical prompts skip the Groq round trip.
+# Multi-worker deployments can share one cache through Redis.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".lc_cache.db")
+if os.getenv("REDIS_URL"):
+    import redis
+    from langchain_community.cache import RedisCache
+
+    set_llm_cache(RedisCache(redis.Redis.from_url(os.getenv("REDIS_URL"))))
+else:
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+
+# Agent system prompt. Kept short because it is sent on every call; when to
+# use each tool is described in the tool docstrings, which the LLM also sees.
+SYSTEM_PROMPT = """You are an autonomous customer support agent. Pick the smallest set of tools that answers the query, call independent tools together, and answer concisely and professionally."""
+
+# Prompt for the final answer, written from the router's draft and tool results
+SYNTHESIS_PROMPT = """You are an autonomous customer support agent writing the final reply to the user's latest message.
+Base the reply on the tool results and the draft answer provided. Do not mention tools.
+If the tools found no relevant information, say so politely and offer to create a support ticket.
+Always be helpful, professional, and concise."""
+
+# Prior messages sent to the LLM each turn (last 5 human/AI exchanges); the
+# full history is still kept in the graph state and returned to callers.
+MAX_PROMPT_HISTORY = 10
+
+# Build the prompt, agent and executor once per worker process and reuse them
+# for every request instead of reconstructing them on each turn.
+prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", SYSTEM_PROMPT),
+        ("placeholder", "{chat_history}"),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ]
+)
 
-AVAILABLE TOOLS:
-1. query_database_tool - For team members, contact info, FAQs, and structured data
-2. query_rag_tool - For documentation, policies, procedures, general information  
-3. create_support_ticket_tool - When you cannot answer or need human expertise
-4. check_ticket_status_tool - For checking existing ticket status
+agent = create_tool_calling_agent(router_llm, SUPPORT_AGENT_TOOLS, prompt)
+agent_executor = AgentExecutor(
+    agent=agent,
+    tools=SUPPORT_AGENT_TOOLS,
+    verbose=False,
+    return_intermediate_steps=True,  # Tool results feed the synthesis step
+)
 
-DECISION FRAMEWORK:
-- People questions → query_database_tool (e.g., "who is alice")
-- Policy/documentation → query_rag_tool (e.g., "refund policy", "pricing")
-- Complex/unknown topics → create_support_ticket_tool (e.g., "custom integration")
-- Ticket status → check_ticket_status_tool (e.g., "status of TKT-ABC123")
+synthesis_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", SYNTHESIS_PROMPT),
+        ("placeholder", "{chat_history}"),
+        ("human", "{input}"),
+        ("system", "Tool results:\n{tool_results}\n\nDraft answer:\n{draft}"),
+    ]
+)
+synthesis_chain = synthesis_prompt | synth_llm
 
-Think step-by-step:
-1. Analyze the user's query
-2. Choose the most appropriate tool(s)
-3. Execute the tool(s)
-4. Synthesize the response
+# Define Nodes
 
-Always be helpful, professional, and concise. If you need to use multiple tools, do so."""
 
-# Define Nodes
+def agent_inputs(state: AgentState) -> dict:
+    chat_history = state["chat_history"]
+    return {
+        "input": chat_history[-1].content,
+        "chat_history": chat_history[:-1][-MAX_PROMPT_HISTORY:],
+        "agent_scratchpad": state["agent_outcome"],
+    }
 
 
 def run_agent(state: AgentState):
     print("---RUN AGENT---")
-    chat_history = state["chat_history"]
-    agent_scratchpad = state["agent_outcome"]
-
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", SYSTEM_PROMPT),
-            ("placeholder", "{chat_history}"),
-            ("human", "{input}"),
-            ("placeholder", "{agent_scratchpad}"),
-        ]
-    )
+    result = agent_executor.invoke(agent_inputs(state))
+    return agent_result_to_state(state, result)
 
-    agent = create_tool_calling_agent(llm, SUPPORT_AGENT_TOOLS, prompt)
-    agent_executor = AgentExecutor(agent=agent, tools=SUPPORT_AGENT_TOOLS, verbose=True)
 
-    result = agent_executor.invoke(
-        {
-            "input": chat_history[-1].content,
-            "chat_history": chat_history[:-1],
-            "agent_scratchpad": agent_scratchpad,
-        }
-    )
+async def arun_agent(state: AgentState):
+    # Async variant used by ainvoke/astream_events so the event loop is never
+    # blocked; the executor runs the sync tools in a worker thread.
+    print("---RUN AGENT---")
+    result = await agent_executor.ainvoke(agent_inputs(state))
+    return agent_result_to_state(state, result)
 
+
+def agent_result_to_state(state: AgentState, result):
     if isinstance(result, BaseMessage):
         # Agent returned a direct response without tool calls
         return {"agent_outcome": [], "chat_history": state["chat_history"] + [result]}
@@ -119,6 +164,39 @@ def run_agent(state: AgentState):
         }
 
 
+def synthesis_inputs(state: AgentState) -> dict:
+    chat_history = state["chat_history"]
+    tool_results = "\n\n".join(
+        f"{step[0].tool}: {step[1]}"
+        for step in state["agent_outcome"]
+        if isinstance(step, tuple) and len(step) == 2
+    )
+    return {
+        "input": chat_history[-2].content,
+        "chat_history": chat_history[:-2][-MAX_PROMPT_HISTORY:],
+        "tool_results": tool_results or "None",
+        "draft": chat_history[-1].content,
+    }
+
+
+def synthesize(state: AgentState):
+    print("---SYNTHESIZE---")
+    response = synthesis_chain.invoke(synthesis_inputs(state))
+    return {
+        "chat_history": state["chat_history"][:-1]
+        + [AIMessage(content=response.content)]
+    }
+
+
+async def asynthesize(state: AgentState):
+    print("---SYNTHESIZE---")
+    response = await synthesis_chain.ainvoke(synthesis_inputs(state))
+    return {
+        "chat_history": state["chat_history"][:-1]
+        + [AIMessage(content=response.content)]
+    }
+
+
 # Create a ToolNode to handle tool execution
 tool_node = ToolNode(SUPPORT_AGENT_TOOLS)
 
@@ -140,34 +218,144 @@ def should_continue(state: AgentState) -> str:
 # Build the graph
 workflow = StateGraph(AgentState)
 
-workflow.add_node("agent", run_agent)
+workflow.add_node("agent", RunnableLambda(run_agent, afunc=arun_agent))
 workflow.add_node("tools", tool_node)
+workflow.add_node("synthesize", RunnableLambda(synthesize, afunc=asynthesize))
 
 workflow.set_entry_point("agent")
 
 workflow.add_conditional_edges(
-    "agent", should_continue, {"continue_tool_call": "tools", "end": END}
+    "agent", should_continue, {"continue_tool_call": "tools", "end": "synthesize"}
 )
 
 workflow.add_edge("tools", "agent")
+workflow.add_edge("synthesize", END)
 
 app = workflow.compile()
 
 
-def process_graph_with_agent(
-    user_input: str, conversation_history: List[BaseMessage] = None
-):
-    initial_state = {
+class GraphBatcher:
+    """
+    Collect graph runs that arrive within a short window and execute them
+    together with app.abatch, resolving one future per caller.
+    A window closes after max_wait seconds or max_batch_size requests.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_wait: float = 0.02):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = None
+        self._worker = None
+        self._flushes = set()
+
+    async def submit(self, state: AgentState):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((state, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Flush in the background so the next window opens immediately
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch):
+        states = [state for state, _ in batch]
+        try:
+            results = await app.abatch(
+                states,
+                config={"max_concurrency": self.max_batch_size},
+                return_exceptions=True,
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # Caller went away (e.g. request cancelled)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+graph_batcher = GraphBatcher()
+
+
+def initial_agent_state(conversation_history: List[BaseMessage] = None) -> AgentState:
+    # The caller has already appended the current user input to the history
+    return {
         "chat_history": (
             conversation_history if conversation_history is not None else []
         ),
-        "agent_outcome": [],  # Initialize agent_outcome as an empty list
+        "agent_outcome": [],
     }
-    # initial_state["chat_history"].append(HumanMessage(content=user_input)) # This is handled by api.py already
 
-    for s in app.stream(initial_state):
-        if "__end__" not in s:
-            pass  # We will handle printing in main.py
 
-    final_state = app.invoke(initial_state)
+# Each entry point runs the graph exactly once: invoke/stream for the CLI,
+# ainvoke (batched) for the JSON endpoint and astream_events for the SSE endpoint.
+def process_graph_with_agent(
+    user_input: str, conversation_history: List[BaseMessage] = None, on_token=None
+):
+    """
+    Run the graph and return the updated chat history. If on_token is given,
+    it is called with each token of the final answer as the LLM produces it.
+    """
+    initial_state = initial_agent_state(conversation_history)
+    if on_token is None:
+        final_state = app.invoke(initial_state)
+        return final_state["chat_history"]
+
+    final_state = initial_state
+    for mode, chunk in app.stream(initial_state, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            message, metadata = chunk
+            # Only the synthesis LLM writes user-facing text; the message the
+            # node returns afterwards repeats it, so it is matched by the
+            # LLM's tag rather than by node name
+            if AGENT_LLM_TAG in metadata.get("tags", ()) and message.content:
+                on_token(message.content)
     return final_state["chat_history"]
+
+
+async def aprocess_graph_with_agent(
+    user_input: str, conversation_history: List[BaseMessage] = None
+):
+    """Async counterpart of process_graph_with_agent for the FastAPI app."""
+    final_state = await graph_batcher.submit(initial_agent_state(conversation_history))
+    return final_state["chat_history"]
+
+
+async def astream_graph_with_agent(conversation_history: List[BaseMessage]):
+    """
+    Run the graph once, yielding ("token", text) as the agent LLM streams and
+    ("final", chat_history) when the graph finishes.
+    """
+    initial_state = initial_agent_state(conversation_history)
+
+    async for event in app.astream_events(initial_state, version="v2"):
+        if event["event"] == "on_chat_model_stream":
+            if AGENT_LLM_TAG in event.get("tags", []):
+                content = event["data"]["chunk"].content
+                if content:
+                    yield "token", content
+        elif event["event"] == "on_chain_end" and not event.get("parent_ids"):
+            yield "final", event["data"]["output"]["chat_history"]
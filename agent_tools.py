@@ -1,11 +1,43 @@
 from langchain.tools import tool
 from database_utils import (
     database_query_tool as db_query,
+    query_faq,
     create_support_ticket,
     get_ticket_by_id,
-    query_ticket_answer,
 )
 from rag_system import rag_search
+from semantic_cache import SemanticCache, embed_question
+
+# Answers already produced for semantically equivalent questions. Only FAQ
+# answers are cached: team and ticket lookups hinge on exact names and ids,
+# which differ by a token or two between otherwise similar questions.
+faq_answer_cache = SemanticCache()
+rag_answer_cache = SemanticCache()
+
+
+def semantic_lookup(cache: SemanticCache, question: str):
+    """
+    Return (cached_answer, question_vector); the vector is None when the
+    question could not be embedded, in which case caching is skipped.
+    """
+    try:
+        vector = embed_question(question)
+    except Exception as e:
+        print(f"Semantic cache unavailable: {e}")
+        return None, None
+    return cache.lookup(vector), vector
+
+
+def cached_query_faq(question: str, llm=None):
+    """query_faq behind the semantic FAQ answer cache."""
+    cached, vector = semantic_lookup(faq_answer_cache, question)
+    if cached:
+        return cached
+
+    answer = query_faq(question, llm)
+    if answer and vector is not None:
+        faq_answer_cache.add(vector, answer)
+    return answer
 
 
 # Database Query Tool
@@ -13,9 +45,11 @@ from rag_system import rag_search
 def query_database_tool(question: str) -> str:
     """
     Search the database for information about team members, FAQs, past tickets, or other structured data.
+    Use for people and contact questions, e.g. "who is alice".
 
     Returns the answer if found. If no information is available, returns a special marker
-    '___NO_INFO_FOUND___' so the main program can prompt the user to create a support ticket.
+    '___NO_INFO_FOUND___'; the reply then offers a support ticket, which is created through
+    create_support_ticket_tool's confirmation step.
 
     Args:
         question (str): The user's query to search in the database.
@@ -24,17 +58,13 @@ def query_database_tool(question: str) -> str:
         str: The response from the database or '___NO_INFO_FOUND___' if no data is found.
     """
     try:
-        # Check past resolved tickets first
-        ticket_answer = query_ticket_answer(question)
-        if ticket_answer:
-            return ticket_answer
-
-        # Normal database query
-        result = db_query(question)
+        # Past resolved tickets, team info and FAQs are looked up concurrently;
+        # a matching resolved ticket takes priority
+        result = db_query(question, check_tickets=True, faq_lookup=cached_query_faq)
         if result and result.get("found"):
             return result["response"]
         else:
-            # Special marker for main.py to detect missing info
+            # Special marker telling the agent nothing was found
             return "___NO_INFO_FOUND___"
     except Exception as e:
         return f"Database query error: {str(e)}"
@@ -45,9 +75,16 @@ def query_database_tool(question: str) -> str:
 def query_rag_tool(question: str) -> str:
     """
     Search documentation and knowledge base using RAG system.
+    Use for policies, procedures and pricing, e.g. "refund policy".
     """
     try:
+        cached, vector = semantic_lookup(rag_answer_cache, question)
+        if cached:
+            return cached
+
         result = rag_search(question)
+        if result and vector is not None:
+            rag_answer_cache.add(vector, result)
         return result if result else "No relevant information found in documentation."
     except Exception as e:
         return f"RAG search error: {str(e)}"
@@ -55,21 +92,29 @@ def query_rag_tool(question: str) -> str:
 
 # Support Ticket Tool
 @tool
-def create_support_ticket_tool(user_question: str, user_name: str = "anonymous") -> str:
+def create_support_ticket_tool(
+    user_question: str, user_confirmed: bool = False, user_name: str = "anonymous"
+) -> str:
     """
-    Ask the user if they want a support ticket created.
+    Create a support ticket for a question that cannot be answered or needs
+    human expertise, e.g. "custom integration".
     Store the actual user question as the issue.
+
+    Confirmation happens through the conversation: call this with
+    user_confirmed=False to get a prompt to relay to the user, and only call it
+    with user_confirmed=True after the user has replied that they want a ticket.
     """
-    # Ask user for confirmation
-    # confirm = input("I don't have an answer for this. Should I create a support ticket? (yes/no): ").strip().lower()
-    # if confirm not in ["yes", "y"]:
-    # return "Okay, no ticket was created."
+    if not user_confirmed:
+        return (
+            "I don't have an answer for this. Would you like me to create a "
+            "support ticket so our team can follow up? (yes/no)"
+        )
 
+    # The ticket is written in the background, so there is no failure to report
     ticket_id = create_support_ticket(user_name=user_name, issue=user_question)
-    if ticket_id:
-        return f"Support ticket #{ticket_id} created successfully. Our team will respond soon."
-    else:
-        return "Failed to create a support ticket. Please try again later."
+    return (
+        f"Support ticket #{ticket_id} created successfully. Our team will respond soon."
+    )
 
 
 # Check Ticket Status Tool
@@ -77,6 +122,7 @@ def create_support_ticket_tool(user_question: str, user_name: str = "anonymous")
 def check_ticket_status_tool(ticket_id: str) -> str:
     """
     Check the status of a ticket and return human response if available.
+    Use when the user asks about an existing ticket, e.g. "status of TKT-ABC123".
     """
     ticket = get_ticket_by_id(ticket_id)
     if not ticket:
@@ -1,11 +1,24 @@
+import json
+import traceback
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from agent_graph import process_graph_with_agent
-from database_utils import create_support_ticket
+from agent_graph import aprocess_graph_with_agent, astream_graph_with_agent
+from database_utils import create_support_ticket, init_ticket_db
+from conversational import conversational_kinds, conversational_reply
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the tickets table and the team/FAQ search indexes before serving
+    init_ticket_db()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 class Message(BaseModel):
@@ -16,89 +29,66 @@ class Message(BaseModel):
 class ChatRequest(BaseModel):
     user_input: str
     conversation_history: List[Message] = []
+    # Clients that keep their own history can skip the full echo and only
+    # append new_messages from the response
+    include_history: bool = True
 
 
 class ChatResponse(BaseModel):
     agent_response: str
-    updated_conversation_history: List[Message]
+    new_messages: List[Message]  # Messages added this turn (user input + reply)
+    updated_conversation_history: Optional[List[Message]] = None
 
 
-def convert_to_langchain_messages(history: List[Message]) -> List[BaseMessage]:
-    langchain_history = []
-    for msg in history:
-        if msg.type == "human":
-            langchain_history.append(HumanMessage(content=msg.content))
-        elif msg.type == "ai":
-            langchain_history.append(AIMessage(content=msg.content))
-    return langchain_history
+_TO_LANGCHAIN = {"human": HumanMessage, "ai": AIMessage}
+_FROM_LANGCHAIN = {HumanMessage: "human", AIMessage: "ai"}
 
 
-def convert_from_langchain_messages(history: List[BaseMessage]) -> List[Message]:
-    generic_history = []
-    for msg in history:
-        if isinstance(msg, HumanMessage):
-            generic_history.append(Message(content=msg.content, type="human"))
-        elif isinstance(msg, AIMessage):
-            generic_history.append(Message(content=msg.content, type="ai"))
-    return generic_history
-
-
-# Conversational Query Functions
-def is_conversational(query: str):
-    """Check if the query is conversational."""
-    conversational_keywords = [
-        "hello",
-        "hi",
-        "hey",
-        "how are you",
-        "good morning",
-        "good afternoon",
-        "good evening",
+def convert_to_langchain_messages(history: List[Message]) -> List[BaseMessage]:
+    return [
+        _TO_LANGCHAIN[msg.type](content=msg.content)
+        for msg in history
+        if msg.type in _TO_LANGCHAIN
     ]
-    query_lower = query.lower().strip()
-    return any(keyword in query_lower for keyword in conversational_keywords)
-
-
-def is_goodbye(query: str):
-    """Check if the query is a goodbye."""
-    goodbye_keywords = ["bye", "goodbye", "see you", "farewell", "take care"]
-    query_lower = query.lower().strip()
-    return any(keyword in query_lower for keyword in goodbye_keywords)
-
-
-def handle_conversational_query(query: str):
-    """Handle conversational queries."""
-    query_lower = query.lower().strip()
 
-    if any(greeting in query_lower for greeting in ["hello", "hi", "hey", "howdy"]):
-        return "Hello! I'm your autonomous customer support agent. How can I help you today?"
 
-    if "how are you" in query_lower:
-        return "I'm functioning well, thank you! I'm here to help you with any questions using my available tools."
-
-    if any(morning in query_lower for morning in ["good morning", "morning"]):
-        return "Good morning! What can I assist you with today?"
+def convert_from_langchain_messages(history: List[BaseMessage]) -> List[Message]:
+    return [
+        Message(content=msg.content, type=_FROM_LANGCHAIN[type(msg)])
+        for msg in history
+        if type(msg) in _FROM_LANGCHAIN
+    ]
 
-    if is_goodbye(query_lower):
-        return "Goodbye! Thank you for chatting with me. Have a great day!"
 
-    return "I'm here to help! How can I assist you today?"
+def build_chat_response(
+    request: ChatRequest, new_messages: List[BaseMessage]
+) -> ChatResponse:
+    """Convert only this turn's messages; the incoming history is reused as-is."""
+    converted = convert_from_langchain_messages(new_messages)
+    return ChatResponse(
+        agent_response=new_messages[-1].content,
+        new_messages=converted,
+        updated_conversation_history=(
+            request.conversation_history + converted
+            if request.include_history
+            else None
+        ),
+    )
 
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(request: ChatRequest):
     try:
-        # Handle conversational queries first
-        if is_conversational(request.user_input) or is_goodbye(request.user_input):
-            response_content = handle_conversational_query(request.user_input)
-            # Directly append to the incoming history and convert once
-            temp_history = convert_to_langchain_messages(request.conversation_history)
-            temp_history.append(HumanMessage(content=request.user_input))
-            temp_history.append(AIMessage(content=response_content))
-            updated_conversation_history = convert_from_langchain_messages(temp_history)
-            return ChatResponse(
-                agent_response=response_content,
-                updated_conversation_history=updated_conversation_history,
+        # Handle conversational queries first, classifying the input once
+        kinds = conversational_kinds(request.user_input)
+        if kinds:
+            response_content = conversational_reply(request.user_input, kinds)
+            return build_chat_response(
+                request,
+                [
+                    HumanMessage(content=request.user_input),
+                    AIMessage(content=response_content),
+                ],
             )
 
         langchain_history = convert_to_langchain_messages(request.conversation_history)
@@ -106,27 +96,61 @@ async def chat_with_agent(request: ChatRequest):
         # Add current user input to history for agent processing
         langchain_history.append(HumanMessage(content=request.user_input))
 
-        response_history = process_graph_with_agent(
+        response_history = await aprocess_graph_with_agent(
             request.user_input, langchain_history
         )
 
-        # The last message in response_history is the agent's latest response
-        agent_response_message = response_history[-1]
-        agent_response_content = agent_response_message.content
-
-        updated_conversation_history = convert_from_langchain_messages(response_history)
-
-        if agent_response_content.strip() == "___NO_INFO_FOUND___":
-            pass
-
-        return ChatResponse(
-            agent_response=agent_response_content,
-            updated_conversation_history=updated_conversation_history,
+        # Everything from the current user input onwards is new this turn
+        return build_chat_response(
+            request, response_history[len(langchain_history) - 1 :]
         )
     except Exception as e:
-        import traceback
-
         print("\n--- FastAPI Error Traceback ---")
         traceback.print_exc()  # Print full traceback to console
         print("-------------------------------")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(payload: dict) -> str:
+    """Format a payload as a Server-Sent Events data frame."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_with_agent_stream(request: ChatRequest):
+    """
+    Stream the agent's answer as Server-Sent Events.
+    Emits {"text": ...} frames while tokens arrive, then one final frame with
+    the ChatResponse fields (or "error").
+    """
+    langchain_history = convert_to_langchain_messages(request.conversation_history)
+    langchain_history.append(HumanMessage(content=request.user_input))
+
+    async def event_stream():
+        try:
+            kinds = conversational_kinds(request.user_input)
+            if kinds:
+                response_content = conversational_reply(request.user_input, kinds)
+                yield sse_event({"text": response_content})
+                response_history = langchain_history + [
+                    AIMessage(content=response_content)
+                ]
+            else:
+                response_history = langchain_history
+                async for kind, data in astream_graph_with_agent(langchain_history):
+                    if kind == "token":
+                        yield sse_event({"text": data})
+                    else:
+                        response_history = data
+
+            response = build_chat_response(
+                request, response_history[len(langchain_history) - 1 :]
+            )
+            yield sse_event(response.model_dump())
+        except Exception as e:
+            print("\n--- FastAPI Error Traceback ---")
+            traceback.print_exc()
+            print("-------------------------------")
+            yield sse_event({"error": str(e)})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -0,0 +1,51 @@
+import re
+from functools import lru_cache
+
+# Conversational Query Functions
+# One case-insensitive pass classifies the whole query; each named group is a
+# kind of small talk, and word boundaries keep "hi" from matching "this".
+# Only these phrases route a query away from the agent.
+_CONVERSATIONAL_RE = re.compile(
+    r"\b(?:"
+    r"(?P<greeting>hello|hi|hey)"
+    r"|(?P<how_are_you>how are you)"
+    r"|(?P<morning>good morning)"
+    r"|(?P<goodbye>bye|goodbye|see you|farewell|take care)"
+    r"|(?P<other>good afternoon|good evening)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+# Extra words that only steer the choice of reply once a query is small talk;
+# on their own they are common in real questions ("yesterday morning").
+_REPLY_HINT_RE = re.compile(
+    r"\b(?:(?P<greeting>howdy)|(?P<morning>morning))\b",
+    re.IGNORECASE,
+)
+
+# Canned replies, in priority order when a query matches several kinds
+_CONVERSATIONAL_REPLIES = {
+    "greeting": "Hello! I'm your autonomous customer support agent. How can I help you today?",
+    "how_are_you": "I'm functioning well, thank you! I'm here to help you with any questions using my available tools.",
+    "morning": "Good morning! What can I assist you with today?",
+    "goodbye": "Goodbye! Thank you for chatting with me. Have a great day!",
+}
+
+
+# Small talk repeats a handful of phrasings, so classifications and replies are
+# memoized; callers pass the stripped input as-is since the regex ignores case.
+@lru_cache(maxsize=64)
+def conversational_kinds(query: str):
+    """Return the frozenset of small-talk kinds found in the query."""
+    return frozenset(match.lastgroup for match in _CONVERSATIONAL_RE.finditer(query))
+
+
+@lru_cache(maxsize=64)
+def conversational_reply(query: str, kinds: frozenset):
+    """Pick the canned reply for an already-classified query."""
+    kinds = kinds | {match.lastgroup for match in _REPLY_HINT_RE.finditer(query)}
+    for kind, reply in _CONVERSATIONAL_REPLIES.items():
+        if kind in kinds:
+            return reply
+
+    return "I'm here to help! How can I assist you today?"
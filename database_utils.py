@@ -1,7 +1,15 @@
+import atexit
 import os
+import queue
 import re
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import pymysql
+from pymysql.constants import ER
+from dbutils.pooled_db import PooledDB
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,20 +19,40 @@ MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_DB = os.getenv("MYSQL_DB", "ai_agent")
-
-
-# Database Connection
-def get_db_connection():
-    """Establish and return a database connection."""
-    try:
-        conn = pymysql.connect(
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "20"))
+
+# Worker threads used to run independent lookups concurrently
+_lookup_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="db-lookup")
+
+# Shared connection pool, created on first use so importing this module
+# does not require the database to be reachable.
+_pool = None
+
+
+def get_connection_pool():
+    """Return the process-wide MySQL connection pool, creating it if needed."""
+    global _pool
+    if _pool is None:
+        _pool = PooledDB(
+            creator=pymysql,
+            maxconnections=MYSQL_POOL_SIZE,
+            blocking=True,  # Wait for a free connection instead of failing
+            mincached=2,
+            ping=1,  # Check connections when they are taken from the pool
             host=MYSQL_HOST,
             user=MYSQL_USER,
             password=MYSQL_PASSWORD or "",
             database=MYSQL_DB,
             cursorclass=pymysql.cursors.DictCursor,
         )
-        return conn
+    return _pool
+
+
+# Database Connection
+def get_db_connection():
+    """Return a pooled database connection; close() hands it back to the pool."""
+    try:
+        return get_connection_pool().connection()
     except Exception as e:
         raise ConnectionError(f"Failed to connect to database: {e}") from e
 
@@ -49,6 +77,7 @@ def init_ticket_db():
                 )
             """
             )
+            ensure_search_indexes(cursor)
             conn.commit()
         print("Ticket table initialized successfully.")
         return True
@@ -63,34 +92,187 @@ def init_ticket_db():
             conn.close()
 
 
-# Support Ticket Functions
-def create_support_ticket(user_name: str, issue: str):
-    """Insert a new support ticket into the database."""
-    conn = None
-    try:
-        conn = get_db_connection()
+def _table_exists(cursor, table: str):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table,),
+    )
+    return cursor.fetchone() is not None
 
-        ticket_id = f"TKT-{uuid.uuid4().hex[:8].upper()}"
 
-        with conn.cursor() as cursor:
+def ensure_search_indexes(cursor):
+    """
+    Add the indexes used by team and FAQ lookups to existing tables:
+    a stored lowercase copy of teams.name with a B-tree index, and a
+    FULLTEXT index over faq(question, answer). Safe to run repeatedly.
+    """
+    if _table_exists(cursor, "teams"):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'teams' AND column_name = 'name_lc'"
+        )
+        if not cursor.fetchone():
             cursor.execute(
                 """
-                INSERT INTO tickets (ticket_id, user_name, issue, status) 
-                VALUES (%s, %s, %s, %s)
-                """,
-                (ticket_id, user_name, issue, "open"),
+                ALTER TABLE teams
+                    ADD COLUMN name_lc VARCHAR(255) GENERATED ALWAYS AS (LOWER(name)) STORED,
+                    ADD INDEX idx_name_lc (name_lc)
+                """
             )
+
+    if _table_exists(cursor, "faq"):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'faq' AND index_name = 'idx_qa'"
+        )
+        if not cursor.fetchone():
+            cursor.execute("ALTER TABLE faq ADD FULLTEXT idx_qa (question, answer)")
+
+
+# Support Ticket Functions
+TICKET_INSERT_SQL = """
+    INSERT INTO tickets (ticket_id, user_name, issue, status) 
+    VALUES (%s, %s, %s, %s)
+"""
+
+
+def new_ticket_id():
+    # 48 random bits, so a clash with the UNIQUE ticket_id is negligible
+    return f"TKT-{uuid.uuid4().hex[:12].upper()}"
+
+
+def _safe_rollback(conn):
+    # A dropped connection fails the rollback too; the write is already lost
+    try:
+        conn.rollback()
+    except Exception:
+        pass
+
+
+class TicketWriter:
+    """
+    Write-behind queue for new tickets. A background thread drains the queue
+    and inserts up to max_batch rows with one executemany and one commit,
+    flushing at least every max_wait seconds.
+    If a batch fails its rows are retried one by one, so only the offending
+    row is lost.
+    """
+
+    def __init__(
+        self, max_batch: int = 32, max_wait: float = 0.05, flush_timeout: float = 5.0
+    ):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.flush_timeout = flush_timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, row: tuple):
+        with self._lock:
+            # Restart the writer if it ever died, so queued tickets still drain
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="ticket-writer", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(row)
+
+    def flush(self, timeout: float = None):
+        """
+        Wait until every submitted ticket has been written (or failed), for at
+        most timeout seconds (flush_timeout by default). Returns False if
+        tickets were still pending when the wait ran out.
+        """
+        if timeout is None:
+            timeout = self.flush_timeout
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(
+                        f"{self._queue.unfinished_tasks} support ticket(s) not written"
+                    )
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(rows) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(rows)
+            except Exception as e:
+                # Never let a failure end the writer thread
+                print(f"Error writing support tickets {[row[0] for row in rows]}: {e}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def _write(self, rows):
+        conn = None
+        try:
+            conn = get_db_connection()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.executemany(TICKET_INSERT_SQL, rows)
+                conn.commit()
+            except Exception as e:
+                _safe_rollback(conn)
+                if len(rows) == 1:
+                    self._write_one(conn, rows[0])
+                    return
+                print(f"Ticket batch of {len(rows)} failed, retrying one by one: {e}")
+                for row in rows:
+                    self._write_one(conn, row)
+        except ConnectionError as e:
+            print(f"Database connection failed, {len(rows)} ticket(s) not saved: {e}")
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _write_one(self, conn, row):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(TICKET_INSERT_SQL, row)
             conn.commit()
-            return ticket_id
-    except ConnectionError as e:
-        print(f"Database connection failed: {e}")
-        return None
-    except Exception as e:
-        print(f"Error creating support ticket: {e}")
-        return None
-    finally:
-        if conn:
-            conn.close()
+        except pymysql.err.IntegrityError as e:
+            _safe_rollback(conn)
+            # The id was already given to the user, so saving the ticket
+            # under a fresh one would leave it unreachable; report it instead
+            if e.args[0] == ER.DUP_ENTRY:
+                print(f"Ticket id {row[0]} already exists, ticket not saved: {e}")
+            else:
+                print(f"Error writing support ticket {row[0]}: {e}")
+        except Exception as e:
+            _safe_rollback(conn)
+            print(f"Error writing support ticket {row[0]}: {e}")
+
+
+ticket_writer = TicketWriter()
+atexit.register(ticket_writer.flush)
+
+
+def create_support_ticket(user_name: str, issue: str):
+    """
+    Queue a new support ticket for insertion and return its id immediately.
+    The row is written by the background TicketWriter within ~50ms, so the
+    write is never confirmed to the caller: failures are only logged.
+    """
+    ticket_id = new_ticket_id()
+    ticket_writer.submit((ticket_id, user_name, issue, "open"))
+    return ticket_id
 
 
 def check_ticket_status(ticket_id: str):
@@ -211,9 +393,9 @@ def query_team_info(question: str):
         conn = get_db_connection()
 
         with conn.cursor() as cursor:
-            # Exact match
+            # Exact match (index seek on the generated lowercase column)
             cursor.execute(
-                "SELECT name, bio FROM teams WHERE LOWER(name) = %s LIMIT 1",
+                "SELECT name, bio FROM teams WHERE name_lc = %s LIMIT 1",
                 (name.lower(),),
             )
             result = cursor.fetchone()
@@ -222,7 +404,7 @@ def query_team_info(question: str):
 
             # Partial match
             cursor.execute(
-                "SELECT name, bio FROM teams WHERE LOWER(name) LIKE %s LIMIT 1",
+                "SELECT name, bio FROM teams WHERE name_lc LIKE %s LIMIT 1",
                 (f"%{name.lower()}%",),
             )
             result = cursor.fetchone()
@@ -243,6 +425,28 @@ def query_team_info(question: str):
 
 def query_faq(question: str, llm=None):
     """Search FAQ table using improved semantic matching with optional LLM assistance."""
+    try:
+        results = _query_faq_candidates(" ".join(question.lower().split()))
+    except ConnectionError as e:
+        print(f"Database connection failed: {e}")
+        return None
+    except Exception as e:
+        print(f"Error querying FAQ: {e}")
+        return None
+
+    if not results:
+        return None
+    if llm and len(results) > 1:
+        return query_faq_with_llm(question, list(results), llm)
+    return results[0]["answer"]
+
+
+@lru_cache(maxsize=1024)
+def _query_faq_candidates(question: str):
+    """
+    Fetch candidate FAQ rows for a normalized question.
+    Errors propagate to the caller so failed lookups are never cached.
+    """
     conn = None
     try:
         conn = get_db_connection()
@@ -250,55 +454,21 @@ def query_faq(question: str, llm=None):
         with conn.cursor() as cursor:
             cursor.execute("SHOW TABLES LIKE 'faq'")
             if not cursor.fetchone():
-                return None
-
-            keywords = extract_keywords(question)
-            if keywords:
-                like_conditions = []
-                params = []
-
-                for keyword in keywords:
-                    like_conditions.append("LOWER(question) LIKE %s")
-                    like_conditions.append("LOWER(answer) LIKE %s")
-                    params.extend([f"%{keyword}%", f"%{keyword}%"])
-
-                if like_conditions:
-                    sql = f"""
-                        SELECT question, answer, 
-                               (CASE 
-                                WHEN LOWER(question) LIKE %s THEN 1
-                                WHEN LOWER(answer) LIKE %s THEN 2
-                                ELSE 3
-                                END) as relevance
-                        FROM faq 
-                        WHERE {' OR '.join(like_conditions)}
-                        ORDER BY relevance, LENGTH(question)
-                        LIMIT 3
-                    """
-                    params.extend([f"%{question.lower()}%", f"%{question.lower()}%"])
-                    cursor.execute(sql, params)
-                    results = cursor.fetchall()
-
-                    if results:
-                        if llm and len(results) > 1:
-                            return query_faq_with_llm(question, results, llm)
-                        return results[0]["answer"]
+                return ()
 
+            # Relevance-ranked lookup through the FULLTEXT index
             cursor.execute(
-                "SELECT question, answer FROM faq WHERE LOWER(question) LIKE %s OR LOWER(answer) LIKE %s ORDER BY LENGTH(question) LIMIT 1",
-                (f"%{question.lower()}%", f"%{question.lower()}%"),
+                """
+                SELECT question, answer,
+                       MATCH(question, answer) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+                FROM faq
+                WHERE MATCH(question, answer) AGAINST (%s IN NATURAL LANGUAGE MODE)
+                ORDER BY score DESC
+                LIMIT 3
+                """,
+                (question, question),
             )
-            result = cursor.fetchone()
-            if result:
-                return result["answer"]
-
-            return None
-    except ConnectionError as e:
-        print(f"Database connection failed: {e}")
-        return None
-    except Exception as e:
-        print(f"Error querying FAQ: {e}")
-        return None
+            return tuple(cursor.fetchall())
     finally:
         if conn:
             conn.close()
@@ -330,76 +500,55 @@ def query_faq_with_llm(question: str, faq_results: list, llm):
 
 
 # Utility Functions
-def extract_keywords(question: str):
-    stop_words = {
-        "the",
-        "a",
-        "an",
-        "and",
-        "or",
-        "but",
-        "is",
-        "are",
-        "was",
-        "were",
-        "what",
-        "when",
-        "where",
-        "why",
-        "how",
-        "your",
-        "you",
-        "me",
-        "my",
-        "our",
-        "we",
-        "us",
-        "i",
-        "he",
-        "she",
-        "it",
-        "they",
-        "them",
-        "this",
-        "that",
-        "these",
-        "those",
-        "to",
-        "for",
-        "with",
-        "by",
-        "at",
-        "on",
-        "in",
-        "of",
-        "about",
-        "as",
-        "if",
-        "then",
-        "than",
-        "so",
-        "because",
-        "can",
-        "could",
-        "would",
-        "should",
-        "will",
-        "shall",
-        "may",
-        "might",
-    }
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", question.lower())
-    return list(set(word for word in words if word not in stop_words))
-
 
-def extract_name_from_question(question: str):
-    patterns = [
+# Matching constants, built once at import instead of on every call
+_NAME_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in [
         r"(?:who is|tell me about|what does|who's|what is)\s+([a-zA-Z\s]+)(?:\'s)?",
         r"([a-zA-Z\s]+)(?:\'s)?(?:\s+profile|info|bio|other name|role)?$",
     ]
+)
+# Substring match (same semantics as the previous keyword loop), in one scan
+_GENERAL_KEYWORDS = (
+    "what",
+    "when",
+    "where",
+    "why",
+    "how",
+    "can",
+    "could",
+    "would",
+    "should",
+    "hours",
+    "time",
+    "open",
+    "close",
+    "location",
+    "address",
+    "contact",
+    "phone",
+    "email",
+    "price",
+    "cost",
+    "service",
+    "support",
+    "help",
+    "business",
+    "work",
+    "operating",
+    "available",
+    "hour",
+    "schedule",
+    "timing",
+)
+_GENERAL_RE = re.compile("|".join(_GENERAL_KEYWORDS))
+
+
+def extract_name_from_question(question: str):
     question_lower = question.lower().strip()
-    for pattern in patterns:
-        match = re.search(pattern, question_lower)
+    for pattern in _NAME_PATTERNS:
+        match = pattern.search(question_lower)
         if match:
             name = match.group(1).strip()
             if len(name) > 2:
@@ -415,66 +564,42 @@ def format_team_response(result: dict):
     return f"{result['name']}: {result['bio']}"
 
 
-def database_query_tool(question: str, llm=None):
+def database_query_tool(
+    question: str, llm=None, check_tickets: bool = False, faq_lookup=None
+):
     """
     Main database query tool that tries multiple tables.
+    The lookups are independent, so they run concurrently and the first
+    non-empty result in priority order wins. With check_tickets, answers from
+    resolved past tickets take precedence over everything else. faq_lookup
+    replaces query_faq, e.g. with a cached version.
     Returns formatted response if found, or None if no info.
     """
-    # For general questions, try FAQ first (with LLM assistance)
-    if is_general_question(question):
-        faq_result = query_faq(question, llm)
-        if faq_result:
-            return {"response": faq_result, "found": True}
+    faq_lookup = faq_lookup or query_faq
+    lookups = {
+        "team": _lookup_executor.submit(query_team_info, question),
+        "faq": _lookup_executor.submit(faq_lookup, question, llm),
+    }
+    if check_tickets:
+        lookups["ticket"] = _lookup_executor.submit(query_ticket_answer, question)
+    results = {key: future.result() for key, future in lookups.items()}
 
-    # Then try team info (for people questions)
-    team_result = query_team_info(question)
-    if team_result:
-        return {"response": team_result, "found": True}
+    # General questions prefer the FAQ, people questions prefer team info
+    if is_general_question(question):
+        priority = ["ticket", "faq", "team"]
+    else:
+        priority = ["ticket", "team", "faq"]
 
-    # If FAQ wasn't tried first, try it now
-    if not is_general_question(question):
-        faq_result = query_faq(question, llm)
-        if faq_result:
-            return {"response": faq_result, "found": True}
+    for key in priority:
+        if results.get(key):
+            return {"response": results[key], "found": True}
 
     # Nothing found
     return {"response": "No information found.", "found": False}
 
 
 def is_general_question(question: str):
-    general_keywords = [
-        "what",
-        "when",
-        "where",
-        "why",
-        "how",
-        "can",
-        "could",
-        "would",
-        "should",
-        "hours",
-        "time",
-        "open",
-        "close",
-        "location",
-        "address",
-        "contact",
-        "phone",
-        "email",
-        "price",
-        "cost",
-        "service",
-        "support",
-        "help",
-        "business",
-        "work",
-        "operating",
-        "available",
-        "hour",
-        "schedule",
-        "timing",
-    ]
-    return any(keyword in question.lower() for keyword in general_keywords)
+    return _GENERAL_RE.search(question.lower()) is not None
 
 
 def check_database_connection():
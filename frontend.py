@@ -1,9 +1,18 @@
+import json
 import streamlit as st
 import requests
 from typing import List, Dict
 
-# FastAPI endpoint URL
-FASTAPI_URL = "http://127.0.0.1:8000/chat"
+# FastAPI streaming endpoint URL
+FASTAPI_STREAM_URL = "http://127.0.0.1:8000/chat/stream"
+
+
+def iter_sse_events(response: requests.Response):
+    """Yield decoded JSON payloads from a Server-Sent Events response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data: "):
+            yield json.loads(line[len("data: ") :])
+
 
 # Initialize chat history in Streamlit's session state
 if "conversation_history" not in st.session_state:
@@ -21,37 +30,50 @@ for message in st.session_state.conversation_history:
 
 # React to user input
 if prompt := st.chat_input("What can I help you with?"):
+    # The backend appends the prompt itself, so send the history before it
+    previous_history = list(st.session_state.conversation_history)
+
     # Add user message to chat history immediately
     st.session_state.conversation_history.append({"type": "human", "content": prompt})
 
-    # Create a placeholder for the agent's response (with a spinner)
+    # Render the agent's response progressively as tokens stream in
     with st.chat_message("ai"):
-        with st.spinner("Thinking..."):
-            # Prepare data for FastAPI request
-            fastapi_request_data = {
-                "user_input": prompt,
-                "conversation_history": st.session_state.conversation_history,
-            }
-
-            agent_response_content = ""
-            try:
-                response = requests.post(FASTAPI_URL, json=fastapi_request_data)
+        placeholder = st.empty()
+        placeholder.markdown("Thinking...")
+
+        # Prepare data for FastAPI request
+        fastapi_request_data = {
+            "user_input": prompt,
+            "conversation_history": previous_history,
+            "include_history": False,  # Only this turn's messages come back
+        }
+
+        agent_response_content = ""
+        try:
+            with requests.post(
+                FASTAPI_STREAM_URL, json=fastapi_request_data, stream=True
+            ) as response:
                 response.raise_for_status()  # Raise an exception for HTTP errors
-                api_response = response.json()
-                agent_response_content = api_response["agent_response"]
-                updated_conversation_history = api_response[
-                    "updated_conversation_history"
-                ]
-
-                # Update Streamlit's session state with the full history from the API
-                st.session_state.conversation_history = updated_conversation_history
-
-            except requests.exceptions.RequestException as e:
-                st.error(
-                    f"Could not connect to the agent backend. Please ensure it is running. Error: {e}"
-                )
-            except Exception as e:
-                st.error(f"An unexpected error occurred: {e}")
-
-            # Display the actual agent response in the same chat message container
-            st.markdown(agent_response_content)
+                for event in iter_sse_events(response):
+                    if "text" in event:
+                        agent_response_content += event["text"]
+                        placeholder.markdown(agent_response_content)
+                    elif "error" in event:
+                        st.error(f"The agent failed to respond: {event['error']}")
+                    else:
+                        # Final frame carries the authoritative answer and the
+                        # messages added this turn
+                        agent_response_content = event["agent_response"]
+                        st.session_state.conversation_history = (
+                            previous_history + event["new_messages"]
+                        )
+
+        except requests.exceptions.RequestException as e:
+            st.error(
+                f"Could not connect to the agent backend. Please ensure it is running. Error: {e}"
+            )
+        except Exception as e:
+            st.error(f"An unexpected error occurred: {e}")
+
+        # Display the final agent response in the same chat message container
+        placeholder.markdown(agent_response_content)
@@ -1,8 +1,10 @@
 import os
+from collections import deque
 from dotenv import load_dotenv
 from agent_graph import process_graph_with_agent
-from database_utils import check_database_connection, create_support_ticket
+from database_utils import check_database_connection
 from rag_system import get_knowledge_base_stats, initialize_vectorstore
+from conversational import conversational_kinds, conversational_reply
 from langchain_core.messages import (
     BaseMessage,
     HumanMessage,
@@ -19,65 +21,30 @@ os.environ["LANGCHAIN_API_KEY"] = os.getenv(
 
 
 # Conversation State Management
+MAX_HISTORY_MESSAGES = 10
+
+_MESSAGE_CLASSES = {"user": HumanMessage, "assistant": AIMessage}
+
+
 class ConversationState:
     def __init__(self):
-        self.history: list[BaseMessage] = []
+        # Bounded: older messages are dropped as new ones arrive
+        self.history: deque[BaseMessage] = deque(maxlen=MAX_HISTORY_MESSAGES)
 
     def add_message(self, role: str, content: str):
-        if role == "user":
-            self.history.append(HumanMessage(content=content))
-        elif role == "assistant":
-            self.history.append(AIMessage(content=content))
+        if role in _MESSAGE_CLASSES:
+            self.history.append(_MESSAGE_CLASSES[role](content=content))
+
+    def set_history(self, history: list[BaseMessage]):
+        self.history = deque(history, maxlen=MAX_HISTORY_MESSAGES)
 
     def get_history(self) -> list[BaseMessage]:
-        return self.history[-10:]  # Keep last 10 messages
+        return list(self.history)  # Already limited to the last 10 messages
 
 
 conversation_state = ConversationState()
 
 
-# Conversational Query Functions
-def is_conversational(query: str):
-    """Check if the query is conversational."""
-    conversational_keywords = [
-        "hello",
-        "hi",
-        "hey",
-        "how are you",
-        "good morning",
-        "good afternoon",
-        "good evening",
-    ]
-    query_lower = query.lower().strip()
-    return any(keyword in query_lower for keyword in conversational_keywords)
-
-
-def is_goodbye(query: str):
-    """Check if the query is a goodbye."""
-    goodbye_keywords = ["bye", "goodbye", "see you", "farewell", "take care"]
-    query_lower = query.lower().strip()
-    return any(keyword in query_lower for keyword in goodbye_keywords)
-
-
-def handle_conversational_query(query: str):
-    """Handle conversational queries."""
-    query_lower = query.lower().strip()
-
-    if any(greeting in query_lower for greeting in ["hello", "hi", "hey", "howdy"]):
-        return "Hello! I'm your autonomous customer support agent. How can I help you today?"
-
-    if "how are you" in query_lower:
-        return "I'm functioning well, thank you! I'm here to help you with any questions using my available tools."
-
-    if any(morning in query_lower for morning in ["good morning", "morning"]):
-        return "Good morning! What can I assist you with today?"
-
-    if is_goodbye(query_lower):
-        return "Goodbye! Thank you for chatting with me. Have a great day!"
-
-    return "I'm here to help! How can I assist you today?"
-
-
 # Main Function
 def main():
     """Main function with autonomous agent."""
@@ -116,21 +83,30 @@ def main():
                 print("Goodbye! Thank you for using our support service.")
                 break
 
-            # Handle conversational queries
-            if is_conversational(user_input) or is_goodbye(user_input):
-                response = handle_conversational_query(user_input)
+            # Handle conversational queries, classifying the input once
+            kinds = conversational_kinds(user_input)
+            if kinds:
+                response = conversational_reply(user_input, kinds)
                 print(f"Assistant: {response}\n")
                 conversation_state.add_message("user", user_input)
                 conversation_state.add_message("assistant", response)
                 continue
 
-            # Use agent for everything else
+            # Use agent for everything else, printing the answer as it streams
             print("Thinking...", end="", flush=True)
             conversation_state.add_message(
                 "user", user_input
             )  # Add user input to history before processing
+            streamed = []
+
+            def print_token(token: str):
+                if not streamed:
+                    print("\rAssistant: ", end="")
+                streamed.append(token)
+                print(token, end="", flush=True)
+
             response_history = process_graph_with_agent(
-                user_input, conversation_state.get_history()
+                user_input, conversation_state.get_history(), on_token=print_token
             )
             response_message = response_history[
                 -1
@@ -140,31 +116,17 @@ def main():
                 if hasattr(response_message, "content")
                 else str(response_message)
             )
-            print(f"\rAssistant: {response_content}\n")
+            if streamed:
+                print("\n")
+            else:
+                print(f"\rAssistant: {response_content}\n")
 
             # Update conversation history with the full response from the agent
             # The process_graph_with_agent now returns the last message of the updated history
             # We need to update the whole history in conversation_state to reflect the full conversation
-            conversation_state.history = response_history
-
-            # Handle unanswered queries
-
-            if response_content.strip() == "___NO_INFO_FOUND___":
-                print("Assistant: I apologize, I don't have an answer to that.")
-                create_ticket = (
-                    input(
-                        "Would you like me to create a support ticket for this issue? (yes/no): "
-                    )
-                    .strip()
-                    .lower()
-                )
-                if create_ticket in ["yes", "y"]:
-                    ticket_id = create_support_ticket("anonymous", user_input)
-                    print(
-                        f"Support ticket #{ticket_id} created successfully. Our support team will reach out to you soon.\n"
-                    )
-                else:
-                    print("Okay, no ticket created.\n")
+            # Unanswered queries are offered a ticket by the agent itself,
+            # through create_support_ticket_tool's confirmation step
+            conversation_state.set_history(response_history)
 
         except KeyboardInterrupt:
             print("\nGoodbye! Thank you for using our support service.")
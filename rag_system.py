@@ -1,20 +1,17 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma  # type:ignore
-from langchain_groq import ChatGroq
-from langchain_openai import AzureOpenAIEmbeddings  # type:ignore
-from chromadb.config import Settings  # type:ignore
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationalRetrievalChain
-from langchain.prompts import ChatPromptTemplate
-from langchain_community.document_loaders import (
-    TextLoader,
-    PyPDFLoader,
-    Docx2txtLoader,
-    WebBaseLoader,
-)
+# Heavy LangChain/Chroma modules are imported where they are first used, so
+# importing this module (e.g. for small-talk-only CLI sessions) stays cheap.
+import bisect
 import os
-import json
+import re
 import hashlib
+import mmap
+import sqlite3
+import threading
+import time
+import orjson
+import xxhash
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -27,17 +24,16 @@ CHROMA_DIR = "chroma_store"
 DOCUMENTS_DIR = "documents"
 COLLECTION_NAME = "customer_support_kb"
 DOCUMENT_TRACKER_FILE = os.path.join(CHROMA_DIR, "document_tracker.json")
-
-# ChromaDB settings
-CHROMA_SETTINGS = Settings(persist_directory=CHROMA_DIR, anonymized_telemetry=False)
-
-# Initialize embeddings
-embeddings = AzureOpenAIEmbeddings(
-    model="text-embedding-3-large",
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version="2023-05-15",
-)
+TRACKER_VERSION = 2  # Bump when the tracker entry format changes
+CHROMA_SENTINEL_FILE = "chroma.sqlite3"  # Written by Chroma when it persists
+HASH_BUFFER_SIZE = 1 << 20  # Read files in 1 MB blocks when hashing
+MMAP_HASH_THRESHOLD = 1 << 20  # Memory-map files larger than this when hashing
+RAG_CACHE_FILE = "rag_cache.db"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+PARALLEL_CHUNK_MIN_DOCUMENTS = 64  # Chunk in worker processes from this size
+EMBED_BATCH_SIZE = 512  # Texts per embedding request (Azure accepts up to 2048)
+EMBED_WORKERS = 8  # Embedding requests in flight at once
 
 # System prompt for customer support
 SYSTEM_PROMPT = """You are a helpful and knowledgeable customer support AI assistant.
@@ -49,119 +45,241 @@ Do not make up answers or provide information not in the documentation."""
 
 
 def get_file_hash(filepath):
-    """Calculate MD5 hash of a file to detect changes."""
-    hash_md5 = hashlib.md5()
+    """
+    Calculate a fast non-cryptographic xxh3 hash of a file to detect changes.
+    Large files are memory-mapped and hashed in one call; small ones are read
+    through a reused buffer, since mapping has a fixed setup cost.
+    """
     try:
-        with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        with open(filepath, "rb", buffering=0) as f:
+            if os.fstat(f.fileno()).st_size > MMAP_HASH_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return xxhash.xxh3_64(mm).hexdigest()
+
+            hasher = xxhash.xxh3_64()
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while size := f.readinto(buffer):
+                hasher.update(view[:size])
+            return hasher.hexdigest()
     except Exception as e:
         print(f"Error calculating hash for {filepath}: {e}")
         return None
 
 
+def is_unchanged(entry, stat_result):
+    """True if a tracker entry still matches the file's mtime and size."""
+    return (
+        entry is not None
+        and entry.get("mtime") == stat_result.st_mtime_ns
+        and entry.get("size") == stat_result.st_size
+    )
+
+
 def load_document_tracker():
-    """Load the document tracking information."""
+    """
+    Load the document tracking information. A tracker written in another
+    format version is ignored, so every document is treated as new.
+    """
     if os.path.exists(DOCUMENT_TRACKER_FILE):
         try:
-            with open(DOCUMENT_TRACKER_FILE, "r") as f:
-                return json.load(f)
+            with open(DOCUMENT_TRACKER_FILE, "rb") as f:
+                data = orjson.loads(f.read())
         except:
             return {}
+        if isinstance(data, dict) and data.get("version") == TRACKER_VERSION:
+            return data.get("documents", {})
     return {}
 
 
 def save_document_tracker(tracker):
-    """Save the document tracking information."""
+    """
+    Save the document tracking information atomically: write it as compact
+    JSON to a temporary file in one call, then rename it over the tracker.
+    """
     os.makedirs(os.path.dirname(DOCUMENT_TRACKER_FILE), exist_ok=True)
-    with open(DOCUMENT_TRACKER_FILE, "w") as f:
-        json.dump(tracker, f, indent=2)
+    tmp_path = DOCUMENT_TRACKER_FILE + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps({"version": TRACKER_VERSION, "documents": tracker}))
+    os.replace(tmp_path, DOCUMENT_TRACKER_FILE)
+
+
+def scan_documents():
+    """
+    List supported files in DOCUMENTS_DIR as (filename, filepath, stat) tuples
+    using a single scandir pass.
+    """
+    if not os.path.exists(DOCUMENTS_DIR):
+        return []
+    with os.scandir(DOCUMENTS_DIR) as it:
+        return [
+            (entry.name, entry.path, entry.stat())
+            for entry in it
+            if entry.is_file()
+            and os.path.splitext(entry.name)[1].lower() in DOCUMENT_LOADERS
+        ]
 
 
-def get_new_or_modified_documents():
-    """Get list of new or modified documents since last processing."""
+def sync_tracker(entries=None):
+    """
+    Compare the documents on disk with the tracker in a single pass.
+    Returns (new_or_modified_paths, tracker): the tracker is updated in place
+    for every present file and pruned of deleted ones, and the caller saves it
+    once the vector store reflects the changes.
+    Files are only hashed when their mtime or size differ from the tracker.
+    """
     tracker = load_document_tracker()
     documents_to_process = []
 
     if not os.path.exists(DOCUMENTS_DIR):
         os.makedirs(DOCUMENTS_DIR)
         print(f"Created {DOCUMENTS_DIR} directory. Please add your documents there.")
-        return documents_to_process
-
-    supported_extensions = {".txt", ".pdf", ".docx", ".doc"}
 
-    for filename in os.listdir(DOCUMENTS_DIR):
-        filepath = os.path.join(DOCUMENTS_DIR, filename)
-        ext = os.path.splitext(filename)[1].lower()
+    if entries is None:
+        entries = scan_documents()
 
-        if ext not in supported_extensions or not os.path.isfile(filepath):
+    for filename, filepath, stat_result in entries:
+        entry = tracker.get(filename)
+        if is_unchanged(entry, stat_result):
             continue
 
-        current_hash = get_file_hash(filepath)
-        if not current_hash:
+        file_hash = get_file_hash(filepath)
+        if not file_hash:
             continue
 
-        file_key = f"{filename}_{os.path.getsize(filepath)}"
-
-        # Check if file is new or modified
-        if file_key not in tracker or tracker[file_key]["hash"] != current_hash:
+        # Check if file is new or modified; a touched but identical file only
+        # gets its mtime refreshed
+        if entry is None or entry["hash"] != file_hash:
             documents_to_process.append(filepath)
+        tracker[filename] = {
+            "hash": file_hash,
+            "filename": filename,
+            "last_processed": datetime.now().isoformat(),
+            "size": stat_result.st_size,
+            "mtime": stat_result.st_mtime_ns,
+        }
+
+    # Forget documents that no longer exist
+    present = {filename for filename, _, _ in entries}
+    for filename in list(tracker):
+        if filename not in present:
+            del tracker[filename]
+
+    return documents_to_process, tracker
+
 
-    return documents_to_process
+# Chunk boundaries, in order of preference
+_SEPARATORS = ("\n\n", "\n", " ")
+_SEPARATOR_RE = re.compile(r"\n\n|\n| ")
+
+# Loader class names in langchain_community.document_loaders, by extension
+DOCUMENT_LOADERS = {
+    ".txt": "TextLoader",
+    ".pdf": "PyPDFLoader",
+    ".docx": "Docx2txtLoader",
+    ".doc": "Docx2txtLoader",
+}
+
+
+def _load_one(filepath):
+    """Load a single document, returning [] if it cannot be read."""
+    filename = os.path.basename(filepath)
+    try:
+        from langchain_community import document_loaders
+
+        loader_class = getattr(
+            document_loaders, DOCUMENT_LOADERS[os.path.splitext(filepath)[1].lower()]
+        )
+        loader = loader_class(filepath)
+        loaded_docs = loader.load()
+        print(f"Loaded: {filename} ({len(loaded_docs)} chunks)")
+        return loaded_docs
+    except Exception as e:
+        print(f"Error loading {filename}: {e}")
+        return []
 
 
 def load_documents(filepaths=None):
     """Load specific documents or all documents if filepaths is None."""
-    documents = []
-
     if filepaths is None:
         # Load all documents (for initial setup)
         if not os.path.exists(DOCUMENTS_DIR):
-            return documents
-
-        supported_extensions = {
-            ".txt": TextLoader,
-            ".pdf": PyPDFLoader,
-            ".docx": Docx2txtLoader,
-            ".doc": Docx2txtLoader,
-        }
+            return []
+        filepaths = [
+            os.path.join(DOCUMENTS_DIR, filename)
+            for filename in os.listdir(DOCUMENTS_DIR)
+        ]
+
+    filepaths = [
+        filepath
+        for filepath in filepaths
+        if os.path.splitext(filepath)[1].lower() in DOCUMENT_LOADERS
+    ]
+
+    # Parsing (PDFs especially) is CPU-bound and files are independent, so
+    # spread them across processes; a single file is loaded in-process
+    if len(filepaths) <= 1:
+        return [doc for filepath in filepaths for doc in _load_one(filepath)]
 
-        for filename in os.listdir(DOCUMENTS_DIR):
-            filepath = os.path.join(DOCUMENTS_DIR, filename)
-            ext = os.path.splitext(filename)[1].lower()
-
-            if ext in supported_extensions:
-                try:
-                    loader = supported_extensions[ext](filepath)
-                    loaded_docs = loader.load()
-                    documents.extend(loaded_docs)
-                    print(f"Loaded: {filename} ({len(loaded_docs)} chunks)")
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}")
-    else:
-        # Load specific documents
-        supported_extensions = {
-            ".txt": TextLoader,
-            ".pdf": PyPDFLoader,
-            ".docx": Docx2txtLoader,
-            ".doc": Docx2txtLoader,
-        }
-
-        for filepath in filepaths:
-            ext = os.path.splitext(filepath)[1].lower()
-            filename = os.path.basename(filepath)
+    documents = []
+    with ProcessPoolExecutor(
+        max_workers=min(len(filepaths), os.cpu_count() or 1)
+    ) as executor:
+        for loaded_docs in executor.map(_load_one, filepaths):
+            documents.extend(loaded_docs)
+    return documents
 
-            if ext in supported_extensions:
-                try:
-                    loader = supported_extensions[ext](filepath)
-                    loaded_docs = loader.load()
-                    documents.extend(loaded_docs)
-                    print(f"Loaded: {filename} ({len(loaded_docs)} chunks)")
-                except Exception as e:
-                    print(f"Error loading {filename}: {e}")
 
-    return documents
+def fast_split(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    Split text into chunks of at most size characters that overlap by up to
+    overlap characters. Like the recursive splitter, a chunk ends at the last
+    paragraph break that fits, else the last line break, else the last space,
+    else it is cut at size. All break positions come from one regex scan.
+    """
+    breaks = {separator: [] for separator in _SEPARATORS}
+    starts_after = []  # Positions just after a separator, where chunks may begin
+    for match in _SEPARATOR_RE.finditer(text):
+        breaks[match.group()].append(match.start())
+        starts_after.append(match.end())
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        limit = start + size
+        hard_cut = False
+        if limit >= len(text):
+            end = len(text)
+        else:
+            end = limit
+            hard_cut = True
+            for separator in _SEPARATORS:
+                positions = breaks[separator]
+                i = bisect.bisect_right(positions, limit) - 1
+                if i >= 0 and positions[i] > start:
+                    end = positions[i]
+                    hard_cut = False
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end == len(text):
+            break
+
+        # Step back by the overlap, then forward to the next separator boundary;
+        # text cut mid-word keeps the full overlap, as the recursive splitter's
+        # character-level fallback does
+        next_start = end
+        if end - overlap > start:
+            i = bisect.bisect_left(starts_after, end - overlap)
+            if i < len(starts_after) and starts_after[i] < end:
+                next_start = starts_after[i]
+            elif hard_cut:
+                next_start = end - overlap
+        start = next_start
+
+    return chunks
 
 
 def chunk_documents(documents):
@@ -169,47 +287,118 @@ def chunk_documents(documents):
     if not documents:
         return []
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""],
-    )
+    # Small batches are not worth the process start-up and pickling cost
+    if len(documents) < PARALLEL_CHUNK_MIN_DOCUMENTS:
+        return [chunk for document in documents for chunk in _chunk_one(document)]
+
+    chunks = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        for document_chunks in executor.map(_chunk_one, documents, chunksize=16):
+            chunks.extend(document_chunks)
+    return chunks
+
+
+def _chunk_one(document):
+    from langchain_core.documents import Document
+
+    return [
+        Document(page_content=chunk, metadata=dict(document.metadata))
+        for chunk in fast_split(document.page_content)
+    ]
+
 
-    return splitter.split_documents(documents)
+def chunk_id(text: str) -> str:
+    """Content-addressed id of a chunk, so identical chunks share one entry."""
+    return xxhash.xxh3_64(text.encode("utf-8")).hexdigest()
+
+
+def add_chunks(vectorstore, chunks):
+    """
+    Embed chunks in large batches, several requests at a time, and write the
+    vectors straight to the Chroma collection.
+    Chunks are keyed by content, so those already in the collection (e.g. the
+    unchanged parts of an edited document) or repeated in the batch are skipped
+    without being embedded again.
+    """
+    unique = {}
+    for chunk in chunks:
+        unique.setdefault(chunk_id(chunk.page_content), chunk)
+    ids = list(unique)
+
+    existing = set()
+    for i in range(0, len(ids), EMBED_BATCH_SIZE):
+        existing.update(
+            vectorstore._collection.get(ids=ids[i : i + EMBED_BATCH_SIZE], include=[])[
+                "ids"
+            ]
+        )
+    ids = [id_ for id_ in ids if id_ not in existing]
+    if not ids:
+        print("All chunks are already embedded")
+        return
+    print(f"Embedding {len(ids)} new chunks ({len(chunks) - len(ids)} already known)")
+
+    chunks = [unique[id_] for id_ in ids]
+    texts = [chunk.page_content for chunk in chunks]
+    batches = [
+        texts[i : i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+        vectors = [
+            vector
+            for batch in executor.map(get_embeddings().embed_documents, batches)
+            for vector in batch
+        ]
+
+    for i in range(0, len(chunks), EMBED_BATCH_SIZE):
+        batch = chunks[i : i + EMBED_BATCH_SIZE]
+        vectorstore._collection.add(
+            ids=ids[i : i + EMBED_BATCH_SIZE],
+            embeddings=vectors[i : i + EMBED_BATCH_SIZE],
+            documents=texts[i : i + EMBED_BATCH_SIZE],
+            metadatas=[chunk.metadata for chunk in batch],
+        )
+
+
+def vectorstore_persisted():
+    """Check for a persisted Chroma store without listing the whole directory."""
+    if os.path.exists(os.path.join(CHROMA_DIR, CHROMA_SENTINEL_FILE)):
+        return True
+    # Older Chroma versions persist parquet files instead of chroma.sqlite3
+    if not os.path.isdir(CHROMA_DIR):
+        return False
+    with os.scandir(CHROMA_DIR) as it:
+        return any(entry.name.endswith(".parquet") for entry in it)
 
 
 def initialize_vectorstore():
     """Initialize or update the vector store with only new/modified documents."""
-    tracker = load_document_tracker()
 
     # Check if vector store already exists
-    vectorstore_exists = os.path.exists(CHROMA_DIR) and any(
-        fname.endswith(".parquet") for fname in os.listdir(CHROMA_DIR)
-    )
+    vectorstore_exists = vectorstore_persisted()
+
+    # List and compare the documents once for all the steps below
+    entries = scan_documents()
+    new_documents, tracker = sync_tracker(entries)
 
     if vectorstore_exists:
         print("Existing vector store found. Checking for document updates...")
-        new_documents = get_new_or_modified_documents()
 
         if not new_documents:
             print("No new or modified documents found. Using existing vector store.")
+            save_document_tracker(tracker)
             return get_vectorstore()
 
         print(f"🔄 Found {len(new_documents)} new or modified documents to process")
         documents = load_documents(new_documents)
     else:
         print("Initializing new vector store...")
-        documents = load_documents()
+        documents = load_documents([filepath for _, filepath, _ in entries])
 
     if not documents:
         print("No documents found. Using empty knowledge base.")
         # Create empty vector store
-        vectorstore = Chroma(
-            embedding_function=embeddings,
-            persist_directory=CHROMA_DIR,
-            collection_name=COLLECTION_NAME,
-        )
+        vectorstore = _open_chroma()
     else:
         chunks = chunk_documents(documents)
         print(f"Chunked into {len(chunks)} pieces")
@@ -217,136 +406,237 @@ def initialize_vectorstore():
         if vectorstore_exists:
             # Add to existing vector store
             vectorstore = get_vectorstore()
-            vectorstore.add_documents(chunks)
+            add_chunks(vectorstore, chunks)
+            clear_answer_cache()
             print("Added new documents to existing vector store")
         else:
             # Create new vector store
-            vectorstore = Chroma.from_documents(
-                documents=chunks,
-                embedding=embeddings,
-                persist_directory=CHROMA_DIR,
-                collection_name=COLLECTION_NAME,
-            )
+            vectorstore = _open_chroma()
+            add_chunks(vectorstore, chunks)
+            clear_answer_cache()
             print("New vector store created")
 
     # Update document tracker
-    update_document_tracker()
+    save_document_tracker(tracker)
+    print("Document tracker updated")
+    set_vectorstore(vectorstore)
     return vectorstore
 
 
-def update_document_tracker():
-    """Update the document tracker with current file states."""
-    tracker = load_document_tracker()
+# Phrases the LLM uses when the documentation has no answer
+_NO_INFO_RE = re.compile(
+    r"not in the documentation|couldn't find|don't have that information|not contained",
+    re.IGNORECASE,
+)
 
-    if not os.path.exists(DOCUMENTS_DIR):
-        return
+# Process-wide singletons, built on first use and reused by every query
+_embeddings = None
+_vectorstore = None
+_llm = None
+_rag_prompt = None
+_http_client = None
 
-    supported_extensions = {".txt", ".pdf", ".docx", ".doc"}
 
-    for filename in os.listdir(DOCUMENTS_DIR):
-        filepath = os.path.join(DOCUMENTS_DIR, filename)
-        ext = os.path.splitext(filename)[1].lower()
+def get_http_client():
+    """
+    Shared pooled HTTP/2 client for the Groq and Azure OpenAI calls, so
+    queries reuse open TLS connections and concurrent embedding batches are
+    multiplexed over them.
+    """
+    global _http_client
+    if _http_client is None:
+        import httpx
 
-        if ext not in supported_extensions or not os.path.isfile(filepath):
-            continue
+        _http_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0),
+        )
+    return _http_client
 
-        file_hash = get_file_hash(filepath)
-        if file_hash:
-            file_key = f"{filename}_{os.path.getsize(filepath)}"
-            tracker[file_key] = {
-                "hash": file_hash,
-                "filename": filename,
-                "last_processed": datetime.now().isoformat(),
-                "size": os.path.getsize(filepath),
-            }
 
-    save_document_tracker(tracker)
-    print("Document tracker updated")
+def get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        from langchain_openai import AzureOpenAIEmbeddings  # type: ignore
+
+        _embeddings = AzureOpenAIEmbeddings(
+            model="text-embedding-3-large",
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version="2023-05-15",
+            http_client=get_http_client(),
+        )
+    return _embeddings
+
+
+def _open_chroma():
+    from langchain_chroma import Chroma  # type: ignore
+
+    return Chroma(
+        embedding_function=get_embeddings(),
+        persist_directory=CHROMA_DIR,
+        collection_name=COLLECTION_NAME,
+    )
+
+
+def _get_rag_prompt():
+    global _rag_prompt
+    if _rag_prompt is None:
+        from langchain_core.prompts import ChatPromptTemplate
+
+        _rag_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", SYSTEM_PROMPT),
+                ("human", "Question: {question}\n\nContext: {context}"),
+            ]
+        )
+    return _rag_prompt
+
+
+# Persistent answer cache shared by all threads of this process
+_answer_cache_lock = threading.Lock()
+_answer_cache = sqlite3.connect(RAG_CACHE_FILE, check_same_thread=False)
+_answer_cache.execute("PRAGMA journal_mode=WAL")
+_answer_cache.execute(
+    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, answer TEXT, ts INTEGER)"
+)
+_answer_cache.commit()
+
+
+def answer_cache_key(query: str, docs) -> str:
+    """Key an answer by the normalized query and the exact chunks it was built from."""
+    chunk_ids = sorted(chunk_id(doc.page_content) for doc in docs)
+    return hashlib.blake2b(
+        f"{query}|{'|'.join(chunk_ids)}".encode(), digest_size=16
+    ).hexdigest()
+
+
+def get_cached_answer(key: str):
+    with _answer_cache_lock:
+        row = _answer_cache.execute(
+            "SELECT answer FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def store_cached_answer(key: str, answer: str):
+    with _answer_cache_lock:
+        _answer_cache.execute(
+            "INSERT OR REPLACE INTO cache (key, answer, ts) VALUES (?, ?, ?)",
+            (key, answer, int(time.time())),
+        )
+        _answer_cache.commit()
+
+
+def clear_answer_cache():
+    """Drop all cached answers, e.g. after the knowledge base changed."""
+    with _answer_cache_lock:
+        _answer_cache.execute("DELETE FROM cache")
+        _answer_cache.commit()
+
+
+def set_vectorstore(vectorstore):
+    """Cache a vector store instance and drop anything derived from the old one."""
+    global _vectorstore
+    _vectorstore = vectorstore
+    _cached_rag_search.cache_clear()
 
 
 def get_vectorstore():
     """Get the vector store instance."""
+    if _vectorstore is not None:
+        return _vectorstore
     try:
-        vectorstore = Chroma(
-            embedding_function=embeddings,
-            persist_directory=CHROMA_DIR,
-            collection_name=COLLECTION_NAME,
-        )
+        vectorstore = _open_chroma()
         # Test connection
         vectorstore._collection.count()
+        set_vectorstore(vectorstore)
         return vectorstore
     except:
         # Initialize if not exists
         return initialize_vectorstore()
 
 
-def rag_search(query: str, conversation_history=None):
-    """
-    Search for answers using RAG system.
-    Returns answer string or None if no relevant information found.
-    """
-    try:
-        vectorstore = get_vectorstore()
-
-        # Check if we have any documents
-        if vectorstore._collection.count() == 0:
-            return None
-
-        retriever = vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 3},  # Get top 3 most relevant chunks
-        )
+def _get_llm():
+    global _llm
+    if _llm is None:
+        from langchain_groq import ChatGroq
 
-        # Initialize LLM
-        llm = ChatGroq(
+        _llm = ChatGroq(
             api_key=os.getenv("GROQ_API_KEY"),
             temperature=0.1,  # Lower temperature for more factual responses
             model_name="llama-3.3-70b-versatile",
+            http_client=get_http_client(),
         )
+    return _llm
 
-        # Create prompt template
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", SYSTEM_PROMPT),
-                ("human", "Question: {question}\n\nContext: {context}"),
-            ]
-        )
 
-        # Use simple retrieval for better control
-        relevant_docs = retriever.invoke(query)
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share cache entries."""
+    return " ".join(query.lower().split())
 
-        if not relevant_docs:
-            return None
 
-        # Combine context from relevant documents
-        context = "\n\n".join([doc.page_content for doc in relevant_docs])
+@lru_cache(maxsize=1024)
+def _embed_normalized_query(query: str):
+    return tuple(get_embeddings().embed_query(query))
 
-        # Create formatted prompt
-        formatted_prompt = prompt.format_messages(question=query, context=context)
 
-        # Get response from LLM
-        response = llm.invoke(formatted_prompt)
-
-        # Check if the response indicates no information found
-        response_text = response.content.strip()
-        if any(
-            phrase in response_text.lower()
-            for phrase in [
-                "not in the documentation",
-                "couldn't find",
-                "don't have that information",
-                "not contained",
-            ]
-        ):
-            return None
+def embed_query_cached(query: str):
+    """Embed a query once; repeats are served from memory without an Azure call."""
+    return _embed_normalized_query(normalize_query(query))
 
-        return response_text
 
+def rag_search(query: str, conversation_history=None):
+    """
+    Search for answers using RAG system.
+    Returns answer string or None if no relevant information found.
+    """
+    try:
+        return _cached_rag_search(normalize_query(query))
     except Exception as e:
         print(f"RAG search error: {e}")
         return None
 
 
+@lru_cache(maxsize=1024)
+def _cached_rag_search(query: str):
+    """Answer a normalized query; errors propagate so they are never cached."""
+    # Embed the query explicitly so the vector is cached and reusable; an
+    # empty knowledge base simply yields no documents
+    query_vector = list(embed_query_cached(query))
+    relevant_docs = get_vectorstore().similarity_search_by_vector(query_vector, k=3)
+
+    if not relevant_docs:
+        return None
+
+    # Identical questions over unchanged documents reuse the stored answer
+    cache_key = answer_cache_key(query, relevant_docs)
+    cached_answer = get_cached_answer(cache_key)
+    if cached_answer is not None:
+        return cached_answer or None
+
+    # Combine context from relevant documents
+    context = "\n\n".join([doc.page_content for doc in relevant_docs])
+
+    # Create formatted prompt
+    formatted_prompt = _get_rag_prompt().format_messages(
+        question=query, context=context
+    )
+
+    # Get response from LLM
+    response = _get_llm().invoke(formatted_prompt)
+
+    # Check if the response indicates no information found
+    response_text = response.content.strip()
+    if _NO_INFO_RE.search(response_text):
+        # Cache the miss too (as an empty answer) so it skips the LLM next time
+        store_cached_answer(cache_key, "")
+        return None
+
+    store_cached_answer(cache_key, response_text)
+    return response_text
+
+
 def get_knowledge_base_stats():
     """Get statistics about the knowledge base."""
     try:
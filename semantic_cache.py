@@ -0,0 +1,83 @@
+import threading
+import time
+from functools import lru_cache
+import numpy as np
+from rag_system import embed_query_cached, normalize_query
+
+# Cosine similarity above which two questions are treated as the same
+SIMILARITY_THRESHOLD = 0.92
+
+
+def embed_question(question: str):
+    """Return the L2-normalized float32 embedding of a question."""
+    return _normalized_vector(normalize_query(question))
+
+
+@lru_cache(maxsize=1024)
+def _normalized_vector(question: str):
+    # Shares the RAG query embedding, so a question is embedded only once
+    vector = np.asarray(embed_query_cached(question), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class SemanticCache:
+    """
+    In-process cache of answers keyed by question embedding.
+    A lookup returns the answer of the most similar cached question when the
+    cosine similarity clears the threshold; entries expire after ttl seconds
+    and the oldest are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SIMILARITY_THRESHOLD,
+        ttl: float = 3600,
+        max_entries: int = 1024,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._answers = []
+        self._timestamps = []
+        self._lock = threading.Lock()
+
+    def lookup(self, vector):
+        """Return the cached answer for the nearest question, or None."""
+        with self._lock:
+            self._expire()
+            if not self._answers:
+                return None
+            scores = self._vectors @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._answers[best]
+            return None
+
+    def add(self, vector, answer: str):
+        """Store an answer under the given question embedding."""
+        with self._lock:
+            if self._answers:
+                self._vectors = np.vstack([self._vectors, vector])
+            else:
+                self._vectors = vector.reshape(1, -1)
+            self._answers.append(answer)
+            self._timestamps.append(time.monotonic())
+            if len(self._answers) > self.max_entries:
+                self._drop(len(self._answers) - self.max_entries)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        for ts in self._timestamps:
+            if ts >= cutoff:
+                break
+            expired += 1
+        if expired:
+            self._drop(expired)
+
+    def _drop(self, count: int):
+        # Entries are kept in insertion order, so the oldest come first
+        self._vectors = self._vectors[count:]
+        del self._answers[:count]
+        del self._timestamps[:count]